@@ -1,12 +1,19 @@
 import pandas as pd
 import numpy as np
 import os
+import sys
+import platform
 from typing import List, Dict, Any, TypedDict
 import warnings
 warnings.filterwarnings('ignore')
 
 import requests
 import json
+import re
+import hashlib
+import time
+import threading
+from collections import OrderedDict
 from langchain_community.vectorstores import FAISS
 from langchain.schema import Document
 from langchain.prompts import PromptTemplate
@@ -14,6 +21,7 @@ from langchain.agents import AgentExecutor, create_react_agent
 from langchain.tools import Tool
 from langgraph.graph import StateGraph, END
 from langchain_community.embeddings import HuggingFaceEmbeddings
+from langchain_core.embeddings import Embeddings
 from langchain.llms.base import LLM
 from pydantic import Field
 from dotenv import load_dotenv
@@ -27,6 +35,33 @@ GROQ_API_URL = os.getenv('GROQ_API_URL', 'https://api.groq.com/openai/v1')
 if not GROQ_API_KEY:
     raise ValueError("GROQ_API_KEY environment variable is required")
 
+# Embedding encoder configuration
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+EMBEDDING_BACKEND = os.getenv('EMBEDDING_BACKEND', 'torch')
+EMBEDDING_THREADS = int(os.getenv('EMBEDDING_THREADS', '0'))
+QUERY_CACHE_SIZE = int(os.getenv('QUERY_CACHE_SIZE', '1024'))
+
+# Index artifact with precomputed localized course cards
+INDEX_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'index')
+COURSE_CARDS_PATH = os.path.join(INDEX_DIR, 'course_cards.json')
+# Part of every card fingerprint; bump the version whenever the translation prompt changes
+COURSE_CARD_VERSION = 2
+COURSE_CARD_MODEL = "llama-3.3-70b-versatile"
+
+# ONNX exports shipped in the all-MiniLM-L6-v2 hub repo; the int8 exports are CPU-specific
+QUANTIZED_ONNX_FILE = (
+    'onnx/model_qint8_arm64.onnx' if platform.machine().lower() in ('arm64', 'aarch64')
+    else 'onnx/model_qint8_avx2.onnx'
+)
+
+embedding_backends = {
+    'torch': None,
+    'onnx': 'onnx/model.onnx',
+    'quantized': QUANTIZED_ONNX_FILE
+}
+
+GROQ_ERROR_RESPONSE = "I apologize, but I'm having trouble processing your request right now."
+
 language_mapping = {
     '6': 'Hindi',
     '7': 'Kannada', 
@@ -72,7 +107,7 @@ class GroqLLM(LLM):
             return result["choices"][0]["message"]["content"]
         except Exception as e:
             print(f"Error calling Groq API: {e}")
-            return "I apologize, but I'm having trouble processing your request right now."
+            return GROQ_ERROR_RESPONSE
 
 class ChatbotState(TypedDict):
     query: str
@@ -122,17 +157,222 @@ Course Number: {row['Course No']}"""
     
     return documents
 
-def setup_rag_system(documents):
-    # Use HuggingFace embeddings instead of Groq (which doesn't support embeddings API)
-    embeddings = HuggingFaceEmbeddings(
-        model_name="sentence-transformers/all-MiniLM-L6-v2",
-        model_kwargs={'device': 'cpu'},
+def create_embeddings(backend: str = EMBEDDING_BACKEND, num_threads: int = EMBEDDING_THREADS):
+    if backend not in embedding_backends:
+        raise ValueError(f"Unknown embedding backend '{backend}', expected one of {list(embedding_backends)}")
+    
+    model_kwargs = {'device': 'cpu'}
+    
+    if backend == 'torch':
+        if num_threads > 0:
+            import torch
+            torch.set_num_threads(num_threads)
+    else:
+        # Run the ONNX export through ONNX Runtime instead of PyTorch
+        ort_kwargs = {'file_name': embedding_backends[backend], 'provider': 'CPUExecutionProvider'}
+        if num_threads > 0:
+            import onnxruntime
+            session_options = onnxruntime.SessionOptions()
+            session_options.intra_op_num_threads = num_threads
+            session_options.inter_op_num_threads = 1
+            ort_kwargs['session_options'] = session_options
+        model_kwargs['backend'] = 'onnx'
+        model_kwargs['model_kwargs'] = ort_kwargs
+    
+    return HuggingFaceEmbeddings(
+        model_name=EMBEDDING_MODEL,
+        model_kwargs=model_kwargs,
         encode_kwargs={'normalize_embeddings': True}
     )
+
+class CachedQueryEmbeddings(Embeddings):
+    """Wraps an embeddings model with an LRU cache of normalized query -> vector.
+
+    Queries that differ only in case or spacing share a cache entry, so only wrap
+    uncased models such as all-MiniLM-L6-v2.
+    """
+    
+    def __init__(self, embeddings: Embeddings, max_size: int = QUERY_CACHE_SIZE):
+        self.embeddings = embeddings
+        self.max_size = max_size
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def normalize_query(text: str) -> str:
+        return re.sub(r'\s+', ' ', text).strip().lower()
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self.cache)}
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+    
+    def embed_query(self, text: str) -> List[float]:
+        key = self.normalize_query(text)
+        
+        with self._lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                return self.cache[key]
+        
+        vector = self.embeddings.embed_query(text)
+        
+        with self._lock:
+            self.misses += 1
+            if self.max_size > 0:
+                self.cache[key] = vector
+                self.cache.move_to_end(key)
+                while len(self.cache) > self.max_size:
+                    self.cache.popitem(last=False)
+        
+        return vector
+
+def course_fingerprint(row) -> str:
+    # Hash of the source columns, prompt version and model a course card is built from
+    source = "|".join([str(row[column]) for column in
+                       ['Course Title', 'Course Description', 'Language_Names', 'Who This Course is For']]
+                      + [str(COURSE_CARD_VERSION), COURSE_CARD_MODEL])
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+def load_course_cards(path: str = COURSE_CARDS_PATH) -> Dict[str, Dict[str, Any]]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def save_course_cards(cards: Dict[str, Dict[str, Any]], path: str = COURSE_CARDS_PATH):
+    # Write to a temp file first so an interrupted save never leaves a truncated artifact
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cards, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+def translate_course_card(llm, content: str, language: str) -> str:
+    prompt = f"""Translate the following course information into {language} line by line.
+Translate every line: course title, course description, available languages, target audience and course number.
+Do not summarise or leave out any line, and keep numbers as digits. Respond ONLY in {language}, with no English explanation.
+
+{content}
+
+{language} course card:"""
+    try:
+        card = str(llm.invoke(prompt)).strip()
+    except Exception as e:
+        print(f"Error translating course card to {language}: {e}")
+        return ""
+    # GroqLLM swallows API errors and returns a fixed apology instead of raising
+    if card == GROQ_ERROR_RESPONSE:
+        print(f"Error translating course card to {language}: LLM call failed")
+        return ""
+    # A card with fewer lines than the source has dropped fields such as languages or target audience
+    if len([line for line in card.splitlines() if line.strip()]) < len([line for line in content.splitlines() if line.strip()]):
+        print(f"Error translating course card to {language}: translation is missing course fields")
+        return ""
+    return card
+
+def build_course_cards(df, llm, path: str = COURSE_CARDS_PATH) -> Dict[str, Dict[str, Any]]:
+    """Precompute translated course cards, rebuilding only courses whose source row changed"""
+    cards = load_course_cards(path)
+    languages = [name for name in language_mapping.values() if name != 'English']
+    rebuilt = reused = failed = 0
+    
+    for doc, (_, row) in zip(create_documents(df), df.iterrows()):
+        course_no = str(row['Course No'])
+        fingerprint = course_fingerprint(row)
+        previous = cards.get(course_no, {})
+        previous_cards = previous.get('cards', {}) if previous.get('fingerprint') == fingerprint else {}
+        
+        course_cards = {}
+        for language in languages:
+            key = language.lower()
+            if previous_cards.get(key):
+                course_cards[key] = previous_cards[key]
+                reused += 1
+                continue
+            
+            # Failed translations are left out so the next run retries them
+            card = translate_course_card(llm, doc.page_content, language)
+            if card:
+                course_cards[key] = card
+                rebuilt += 1
+            else:
+                failed += 1
+        
+        if course_cards != previous_cards or previous.get('fingerprint') != fingerprint:
+            cards[course_no] = {'fingerprint': fingerprint, 'cards': course_cards}
+            save_course_cards(cards, path)
+    
+    # Drop courses that are no longer in the dataset
+    course_nos = {str(course_no) for course_no in df['Course No']}
+    cards = {course_no: entry for course_no, entry in cards.items() if course_no in course_nos}
+    save_course_cards(cards, path)
+    
+    print(f"Course cards: {rebuilt} rebuilt, {reused} reused, {failed} failed, saved to {path}")
+    return cards
+
+def current_course_cards(df, cards: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, str]]:
+    # Drop cards whose source row changed since they were built, and any empty cards
+    current = {}
+    for _, row in df.iterrows():
+        entry = cards.get(str(row['Course No']), {})
+        if entry.get('fingerprint') == course_fingerprint(row):
+            current[str(row['Course No'])] = {
+                language: card for language, card in entry.get('cards', {}).items()
+                if card and card != GROQ_ERROR_RESPONSE
+            }
+    return current
+
+def setup_rag_system(documents, backend: str = EMBEDDING_BACKEND, num_threads: int = EMBEDDING_THREADS,
+                     cache_size: int = QUERY_CACHE_SIZE):
+    # Use HuggingFace embeddings instead of Groq (which doesn't support embeddings API)
+    embeddings = CachedQueryEmbeddings(create_embeddings(backend, num_threads), max_size=cache_size)
     vectorstore = FAISS.from_documents(documents, embeddings)
     retriever = vectorstore.as_retriever(search_kwargs={'k': 5})
     return retriever
 
+def benchmark_encoder_backends(documents, queries: List[str], backends: List[str] = None,
+                               num_threads: int = 1, tolerance: float = 0.02, rounds: int = 3) -> Dict[str, Dict[str, Any]]:
+    # Compare every backend against the PyTorch encoder on query/course cosine scores and throughput
+    backends = backends or list(embedding_backends)
+    texts = [doc.page_content for doc in documents]
+    results = {}
+    reference_scores = None
+    
+    for backend in ['torch'] + [b for b in backends if b != 'torch']:
+        embeddings = create_embeddings(backend, num_threads)
+        doc_vectors = np.array(embeddings.embed_documents(texts))
+        
+        embeddings.embed_query(queries[0])  # warm up
+        start = time.perf_counter()
+        for _ in range(rounds):
+            query_vectors = np.array([embeddings.embed_query(query) for query in queries])
+        elapsed = time.perf_counter() - start
+        
+        scores = query_vectors @ doc_vectors.T
+        if reference_scores is None:
+            reference_scores = scores
+        max_diff = float(np.max(np.abs(scores - reference_scores)))
+        top1_agreement = float(np.mean(scores.argmax(axis=1) == reference_scores.argmax(axis=1)))
+        queries_per_second = len(queries) * rounds / elapsed
+        
+        results[backend] = {
+            'max_score_diff': max_diff,
+            'top1_agreement': top1_agreement,
+            'parity': max_diff <= tolerance,
+            'queries_per_second': queries_per_second,
+            'queries_per_second_per_core': queries_per_second / max(num_threads, 1)
+        }
+        print(f"{backend}: max score diff {max_diff:.4f} ({'ok' if max_diff <= tolerance else 'FAIL'}), "
+              f"top-1 agreement {top1_agreement:.2%}, {results[backend]['queries_per_second_per_core']:.1f} queries/s/core")
+    
+    return {backend: results[backend] for backend in backends}
+
 def retrieve_documents(state: ChatbotState, retriever) -> ChatbotState:
     query = state['query']
     print(f"DEBUG: retrieve_documents - language is: {state.get('language', 'not set')}")
@@ -202,7 +442,7 @@ def check_relevance(state: ChatbotState, llm) -> ChatbotState:
     
     return state
 
-def generate_response(state: ChatbotState, llm) -> ChatbotState:
+def generate_response(state: ChatbotState, llm, course_cards: Dict[str, Dict[str, str]] = None) -> ChatbotState:
     query = state['query']
     docs = state['retrieved_docs']
     has_relevant_info = state['has_relevant_info']
@@ -215,7 +455,12 @@ def generate_response(state: ChatbotState, llm) -> ChatbotState:
         state['response'] = generate_no_info_response(query, selected_language)
         return state
     
-    context = "\n\n".join([doc.page_content for doc in docs])
+    # Use the precomputed target-language card so the LLM doesn't re-translate course text
+    course_cards = course_cards or {}
+    context = "\n\n".join([
+        course_cards.get(str(doc.metadata.get('course_no')), {}).get(selected_language) or doc.page_content
+        for doc in docs
+    ])
     
     language_instructions = {
         'hindi': "IMPORTANT: You MUST respond ONLY in Hindi (हिंदी). Do not use English words.",
@@ -441,6 +686,7 @@ class BossWallahChatbot:
         self.df = load_and_process_data()
         self.documents = create_documents(self.df)
         self.retriever = setup_rag_system(self.documents)
+        self.course_cards = current_course_cards(self.df, load_course_cards())
         self.llm = GroqLLM(model="llama-3.3-70b-versatile", temperature=0.1)
         self.app = self.setup_langgraph()
     
@@ -450,7 +696,7 @@ class BossWallahChatbot:
         workflow.add_node("retrieve", lambda state: retrieve_documents(state, self.retriever))
         workflow.add_node("detect_language", detect_language)
         workflow.add_node("check_relevance", lambda state: check_relevance(state, self.llm))
-        workflow.add_node("generate_response", lambda state: generate_response(state, self.llm))
+        workflow.add_node("generate_response", lambda state: generate_response(state, self.llm, self.course_cards))
         workflow.add_node("generate_no_info", lambda state: {**state, "response": generate_no_info_response(state['query'], state.get('language', 'english'))})
         
         workflow.set_entry_point("retrieve")
@@ -486,6 +732,24 @@ class BossWallahChatbot:
         return result.get('response', 'No response generated')
 
 def main():
+    if '--benchmark-encoders' in sys.argv:
+        documents = create_documents(load_and_process_data())
+        results = benchmark_encoder_backends(documents, [
+            "Tell me about honey bee farming course",
+            "I want to learn how to start a poultry farm",
+            "Do you have any courses in Tamil?",
+            "I am a recent high school graduate, are there any opportunities for me?"
+        ], num_threads=max(EMBEDDING_THREADS, 1))
+        failed = [backend for backend, result in results.items() if not result['parity']]
+        if failed:
+            print(f"Score parity check failed for: {', '.join(failed)}")
+            sys.exit(1)
+        return
+    
+    if '--build-course-cards' in sys.argv:
+        build_course_cards(load_and_process_data(), GroqLLM(model=COURSE_CARD_MODEL, temperature=0.1))
+        return
+    
     print("Initializing Boss Wallah AI Support Agent...")
     chatbot = BossWallahChatbot()
     
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# main.py is imported as a top-level module (like api.py and app.py do) and requires a Groq key at import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+os.environ.setdefault('GROQ_API_KEY', 'test-key')
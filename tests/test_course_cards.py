@@ -0,0 +1,206 @@
+import json
+
+import pandas as pd
+import pytest
+
+import main
+from main import (
+    GROQ_ERROR_RESPONSE,
+    build_course_cards,
+    create_documents,
+    current_course_cards,
+    generate_response,
+    language_mapping,
+)
+
+LANGUAGES = [name for name in language_mapping.values() if name != 'English']
+
+
+class FakeLLM:
+    """Local stand-in for GroqLLM that records prompts and returns canned translations"""
+
+    def __init__(self, responses=None):
+        self.prompts = []
+        self.responses = responses or {}
+
+    def invoke(self, prompt: str) -> str:
+        self.prompts.append(prompt)
+        call = len(self.prompts)
+        if call in self.responses:
+            response = self.responses[call]
+            if isinstance(response, BaseException):
+                raise response
+            return response
+        if not prompt.endswith("course card:"):
+            return "fake answer"
+        # "Translate" each source line by tagging it and upper-casing the English text
+        language = prompt.split(" into ", 1)[1].split(" ", 1)[0]
+        content = prompt.split("\n\n")[1]
+        return "\n".join(f"[{language}] {line.upper()}" for line in content.splitlines())
+
+
+def make_df(courses):
+    df = pd.DataFrame([
+        {
+            'Course No': course_no,
+            'Course Title': title,
+            'Course Description': description,
+            'Released Languages': '6,20,24',
+            'Who This Course is For': 'Farmers'
+        }
+        for course_no, title, description in courses
+    ])
+    df['Languages'] = [['Hindi', 'Tamil', 'English']] * len(df)
+    df['Language_Names'] = df['Languages'].apply(', '.join)
+    return df
+
+
+@pytest.fixture
+def df():
+    return make_df([
+        (1, 'Honey Bee Farming', 'Start a honey bee farm'),
+        (2, 'Poultry Farming', 'Raise chickens for eggs and meat'),
+    ])
+
+
+@pytest.fixture
+def cards_path(tmp_path):
+    return str(tmp_path / 'index' / 'course_cards.json')
+
+
+def relevant_state(docs, language):
+    return {
+        'query': 'Tell me about honey bee farming',
+        'retrieved_docs': docs,
+        'response': '',
+        'language': language,
+        'relevance_score': 0.9,
+        'has_relevant_info': True
+    }
+
+
+def test_first_build_translates_every_course_and_language(df, cards_path):
+    llm = FakeLLM()
+    cards = build_course_cards(df, llm, cards_path)
+
+    assert len(llm.prompts) == len(df) * len(LANGUAGES)
+    hindi_card = cards['1']['cards']['hindi']
+    assert '[Hindi] COURSE TITLE: HONEY BEE FARMING' in hindi_card
+    assert '[Hindi] AVAILABLE LANGUAGES: HINDI, TAMIL, ENGLISH' in hindi_card
+    assert '[Hindi] TARGET AUDIENCE: FARMERS' in hindi_card
+    assert '[Hindi] COURSE NUMBER: 1' in hindi_card
+    with open(cards_path, encoding='utf-8') as f:
+        assert json.load(f) == cards
+
+
+def test_second_build_makes_no_calls(df, cards_path):
+    build_course_cards(df, FakeLLM(), cards_path)
+    llm = FakeLLM()
+    build_course_cards(df, llm, cards_path)
+
+    assert llm.prompts == []
+
+
+def test_changed_row_rebuilds_only_that_course(df, cards_path):
+    cards = build_course_cards(df, FakeLLM(), cards_path)
+
+    df.loc[df['Course No'] == 2, 'Course Title'] = 'Backyard Poultry Farming'
+    current = current_course_cards(df, cards)
+    assert '2' not in current
+    assert current['1'] == cards['1']['cards']
+
+    llm = FakeLLM()
+    cards = build_course_cards(df, llm, cards_path)
+
+    assert len(llm.prompts) == len(LANGUAGES)
+    assert all('Backyard Poultry Farming' in prompt for prompt in llm.prompts)
+    assert '[Tamil] COURSE TITLE: BACKYARD POULTRY FARMING' in cards['2']['cards']['tamil']
+
+
+def test_prompt_version_change_rebuilds_all_cards(df, cards_path, monkeypatch):
+    cards = build_course_cards(df, FakeLLM(), cards_path)
+
+    monkeypatch.setattr(main, 'COURSE_CARD_VERSION', main.COURSE_CARD_VERSION + 1)
+    assert current_course_cards(df, cards) == {}
+
+    llm = FakeLLM()
+    build_course_cards(df, llm, cards_path)
+    assert len(llm.prompts) == len(df) * len(LANGUAGES)
+
+
+def test_card_missing_fields_is_rejected(df, cards_path):
+    llm = FakeLLM({1: 'मधुमक्खी पालन पाठ्यक्रम'})
+    cards = build_course_cards(df, llm, cards_path)
+
+    assert 'hindi' not in cards['1']['cards']
+
+
+def test_generate_response_uses_target_language_card(df, cards_path):
+    course_cards = current_course_cards(df, build_course_cards(df, FakeLLM(), cards_path))
+    docs = create_documents(df)[:1]
+
+    llm = FakeLLM()
+    state = generate_response(relevant_state(docs, 'hindi'), llm, course_cards)
+
+    assert '[Hindi] COURSE TITLE: HONEY BEE FARMING' in llm.prompts[0]
+    # The English course text isn't sent, so the LLM has nothing to re-translate
+    assert 'Start a honey bee farm' not in llm.prompts[0]
+    assert state['response'] == 'fake answer'
+
+    english_llm = FakeLLM()
+    generate_response(relevant_state(docs, 'english'), english_llm, course_cards)
+    assert 'Start a honey bee farm' in english_llm.prompts[0]
+
+
+def test_localized_prompt_is_close_to_english_prompt(df, cards_path):
+    # Latency proxy: with cards, a non-English request sends no English course text to
+    # translate and a prompt of about the same size as the English request
+    course_cards = current_course_cards(df, build_course_cards(df, FakeLLM(), cards_path))
+    docs = create_documents(df)
+
+    english_llm = FakeLLM()
+    generate_response(relevant_state(docs, 'english'), english_llm, course_cards)
+
+    for language in LANGUAGES:
+        llm = FakeLLM()
+        generate_response(relevant_state(docs, language.lower()), llm, course_cards)
+        assert 'Raise chickens for eggs and meat' not in llm.prompts[0]
+        assert len(llm.prompts[0]) <= 1.5 * len(english_llm.prompts[0])
+
+
+def test_failed_translations_are_not_stored_and_retried(df, cards_path):
+    llm = FakeLLM({1: GROQ_ERROR_RESPONSE, 2: '   ', 3: RuntimeError('rate limited')})
+    cards = build_course_cards(df, llm, cards_path)
+
+    failed = {language.lower() for language in LANGUAGES[:3]}
+    assert failed.isdisjoint(cards['1']['cards'])
+    assert len(cards['1']['cards']) == len(LANGUAGES) - 3
+
+    retry_llm = FakeLLM()
+    cards = build_course_cards(df, retry_llm, cards_path)
+
+    assert len(retry_llm.prompts) == 3
+    assert len(cards['1']['cards']) == len(LANGUAGES)
+
+
+def test_missing_or_empty_card_falls_back_to_course_text(df):
+    docs = create_documents(df)[:1]
+    page_content = docs[0].page_content
+
+    for course_cards in ({}, {'1': {'hindi': ''}}):
+        llm = FakeLLM()
+        generate_response(relevant_state(docs, 'hindi'), llm, course_cards)
+        assert page_content in llm.prompts[0]
+
+
+def test_interrupted_build_keeps_finished_courses(df, cards_path):
+    llm = FakeLLM({len(LANGUAGES) + 1: KeyboardInterrupt()})
+    with pytest.raises(KeyboardInterrupt):
+        build_course_cards(df, llm, cards_path)
+
+    retry_llm = FakeLLM()
+    cards = build_course_cards(df, retry_llm, cards_path)
+
+    assert len(retry_llm.prompts) == len(LANGUAGES)
+    assert all('Poultry Farming' in prompt for prompt in retry_llm.prompts)
+    assert set(cards) == {'1', '2'}
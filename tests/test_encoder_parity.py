@@ -0,0 +1,24 @@
+import pytest
+
+pytest.importorskip('sentence_transformers')
+pytest.importorskip('onnxruntime')
+pytest.importorskip('optimum.onnxruntime')
+
+from main import benchmark_encoder_backends, create_documents, load_and_process_data
+
+QUERIES = [
+    "Tell me about honey bee farming course",
+    "Do you have any courses in Tamil?",
+    "I am a recent high school graduate, are there any opportunities for me?"
+]
+
+
+def test_onnx_backends_match_torch_scores():
+    documents = create_documents(load_and_process_data())[:20]
+    try:
+        results = benchmark_encoder_backends(documents, QUERIES, backends=['onnx', 'quantized'], rounds=1)
+    except OSError as e:
+        pytest.skip(f"Embedding model files not available: {e}")
+
+    for backend, result in results.items():
+        assert result['parity'], f"{backend} max score diff {result['max_score_diff']:.4f}"
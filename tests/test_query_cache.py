@@ -0,0 +1,55 @@
+from typing import List
+
+from langchain_core.embeddings import Embeddings
+
+from main import CachedQueryEmbeddings
+
+
+class CountingEmbeddings(Embeddings):
+    def __init__(self):
+        self.queries = []
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [[float(len(text))] for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        self.queries.append(text)
+        return [float(len(text))]
+
+
+def test_case_and_whitespace_variants_hit_cache():
+    inner = CountingEmbeddings()
+    embeddings = CachedQueryEmbeddings(inner, max_size=8)
+
+    first = embeddings.embed_query("Honey bee farming")
+    second = embeddings.embed_query("  honey   BEE\tfarming ")
+
+    assert first == second
+    assert inner.queries == ["Honey bee farming"]
+    assert embeddings.stats() == {'hits': 1, 'misses': 1, 'size': 1}
+
+
+def test_least_recently_used_entry_is_evicted():
+    inner = CountingEmbeddings()
+    embeddings = CachedQueryEmbeddings(inner, max_size=2)
+
+    embeddings.embed_query("poultry")
+    embeddings.embed_query("dairy")
+    embeddings.embed_query("poultry")  # refresh, so "dairy" is now oldest
+    embeddings.embed_query("goat")
+
+    assert list(embeddings.cache) == ["poultry", "goat"]
+    embeddings.embed_query("dairy")
+    assert inner.queries == ["poultry", "dairy", "goat", "dairy"]
+
+
+def test_zero_size_disables_cache():
+    inner = CountingEmbeddings()
+    embeddings = CachedQueryEmbeddings(inner, max_size=0)
+
+    embeddings.embed_query("poultry")
+    embeddings.embed_query("poultry")
+
+    assert inner.queries == ["poultry", "poultry"]
+    assert not embeddings.cache
+    assert embeddings.hits == 0